@@ -3,13 +3,16 @@ Pulse AI Assistant Performance Tracking Dashboard
 A Shiny for Python application for monitoring AI assistant metrics
 """
 
+import functools
+import json
+from collections import namedtuple
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from brand_yml import Brand
 from shiny import App, ui, render, reactive
 from shiny.types import FileInfo
 from shinywidgets import render_widget, output_widget
@@ -20,24 +23,57 @@ import faicons
 def load_data():
     """Load and prepare the synthetic datasets"""
     try:
-        customers = pd.read_csv("data/synthetic-customers.csv")
+        # Explicit dtypes and date formats let the C parser convert every
+        # column in a single pass, without type inference or re-parsing
+        customers = pd.read_csv(
+            "data/synthetic-customers.csv",
+            dtype={"customer_segment": "category"},
+            parse_dates=["signup_date"],
+            date_format="%Y-%m-%d",
+        )
         usage_data = pd.read_csv("data/synthetic-usage-data.csv")
-        support_tickets = pd.read_csv("data/synthetic-support-tickets.csv")
-        ai_interventions = pd.read_csv("data/synthetic-ai-interventions.csv")
-
-        # Convert date columns
-        ai_interventions["intervention_date"] = pd.to_datetime(
-            ai_interventions["intervention_date"]
+        support_tickets = pd.read_csv(
+            "data/synthetic-support-tickets.csv",
+            parse_dates=["created_date"],
+            date_format="%Y-%m-%d",
         )
-        support_tickets["created_date"] = pd.to_datetime(
-            support_tickets["created_date"]
+        ai_interventions = pd.read_csv(
+            "data/synthetic-ai-interventions.csv",
+            dtype={
+                "intervention_type": "category",
+                "savings_amount": np.float64,
+                "confidence_score": np.float64,
+            },
+            parse_dates=["intervention_date"],
+            date_format="%Y-%m-%d",
         )
-        customers["signup_date"] = pd.to_datetime(customers["signup_date"])
-
-        return customers, usage_data, support_tickets, ai_interventions
     except FileNotFoundError:
         # If data doesn't exist, create sample data
-        return create_sample_data()
+        customers, usage_data, support_tickets, ai_interventions = (
+            create_sample_data()
+        )
+
+    # Store repeated labels as categoricals so filters and groupbys work on
+    # integer codes
+    ai_interventions["intervention_type"] = ai_interventions[
+        "intervention_type"
+    ].astype("category")
+    customers["customer_segment"] = customers["customer_segment"].astype("category")
+
+    # Refer to customers by their row position in the customers table (-1 if
+    # unknown) instead of by ID string, and denormalize the customer segment
+    # onto each intervention through it, so filtering never joins the tables
+    cid = pd.Index(customers["customer_id"]).get_indexer(
+        ai_interventions["customer_id"]
+    )
+    ai_interventions = ai_interventions.drop(columns="customer_id").assign(
+        cid=cid.astype(np.int32),
+        customer_segment=customers["customer_segment"].array.take(
+            cid, allow_fill=True
+        ),
+    )
+
+    return customers, usage_data, support_tickets, ai_interventions
 
 
 def create_sample_data():
@@ -76,9 +112,189 @@ def create_sample_data():
     return customers, pd.DataFrame(), pd.DataFrame(), ai_interventions
 
 
+def week_start(dates):
+    """Floor datetime64 values to the Monday that starts their week"""
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    # 1970-01-01 was a Thursday, so shift by 3 days to align weeks on Mondays
+    return ((days + 3) // 7 * 7 - 3).astype("datetime64[D]")
+
+
 # Load data
 customers, usage_data, support_tickets, ai_interventions = load_data()
 
+# Sort interventions by date once at startup, so that filtering only needs a
+# binary search on dates plus membership tests
+ai_sorted = ai_interventions.sort_values("intervention_date", kind="stable")
+
+# Columns of interventions as parallel numpy arrays
+Interventions = namedtuple(
+    "Interventions",
+    [
+        "date",
+        "week",
+        "month",
+        "type_code",
+        "segment_code",
+        "cid",
+        "savings",
+        "confidence",
+    ],
+)
+
+# The hot path filters and reduces these contiguous arrays directly, without
+# pandas' per-column dispatch. Weeks (starting Monday) and months are stored
+# as integer day and month numbers so they can be used as bucket keys.
+intervention_dates = ai_sorted["intervention_date"].values
+interventions = Interventions(
+    date=intervention_dates,
+    week=week_start(intervention_dates).astype(np.int64),
+    month=intervention_dates.astype("datetime64[M]").astype(np.int64),
+    type_code=ai_sorted["intervention_type"].cat.codes.values,
+    segment_code=ai_sorted["customer_segment"].cat.codes.values,
+    cid=ai_sorted["cid"].values,
+    savings=ai_sorted["savings_amount"].values,
+    confidence=ai_sorted["confidence_score"].values,
+)
+type_categories = ai_sorted["intervention_type"].cat.categories
+segment_categories = ai_sorted["customer_segment"].cat.categories
+
+# Customers per segment never change, so count them once for adoption rates
+segment_codes = customers["customer_segment"].cat.codes.values
+customers_per_segment = np.bincount(
+    segment_codes[segment_codes >= 0], minlength=len(segment_categories)
+)
+
+
+def category_mask(codes, categories, selected):
+    """Boolean row mask of categorical codes whose category is in selected"""
+    # Trailing False maps missing values (code -1) to unselected
+    selected_codes = np.append(categories.isin(selected), False)
+    return selected_codes[codes]
+
+
+@functools.lru_cache(maxsize=32)
+def filter_interventions(start, end, intervention_types, customer_segments):
+    """Select interventions in the inclusive date range, types and segments"""
+    # Date range is a contiguous slice of the date-sorted interventions
+    lo, hi = np.searchsorted(intervention_dates, [start, end + np.timedelta64(1, "D")])
+    selected = category_mask(
+        interventions.type_code[lo:hi], type_categories, intervention_types
+    ) & category_mask(
+        interventions.segment_code[lo:hi], segment_categories, customer_segments
+    )
+    rows = lo + np.flatnonzero(selected)
+
+    # Memoized results are shared by every session, so guard against writes
+    columns = [column[rows] for column in interventions]
+    for column in columns:
+        column.setflags(write=False)
+
+    return Interventions(*columns)
+
+
+def bucket_sums(buckets, *values):
+    """Sum each values array per integer bucket, skipping empty buckets"""
+    origin = buckets.min() if len(buckets) else 0
+    index = buckets - origin
+    counts = np.bincount(index)
+    occupied = np.flatnonzero(counts)
+    sums = [np.bincount(index, weights=v)[occupied] for v in values]
+    # Occupied bucket keys, their row counts, then one sum per values array
+    return occupied + origin, counts[occupied], *sums
+
+
+# Load the brand once, for both the app theme and the plot styling
+brand = Brand.from_yaml(__file__)
+
+# Layout shared by all figures, resolved from the brand once at startup
+plot_layout = dict(
+    font_family=brand.typography.base.family,
+    colorway=[
+        brand.color.primary,
+        brand.color.secondary,
+        brand.color.tertiary,
+        brand.color.warning,
+        brand.color.danger,
+    ],
+    plot_bgcolor=brand.color.background,
+    height=400,
+    title_font_size=16,
+    margin=dict(t=60),
+)
+
+# Figure skeletons are built once; the plot outputs copy them and only swap in
+# the data, skipping plotly express' column inference and layout resolution
+# Line charts use WebGL (scattergl) traces, which stay fast with many points
+savings_trend_fig = go.Figure(
+    go.Scattergl(
+        mode="lines",
+        line=dict(color=brand.color.primary, width=3),
+        hovertemplate="Week=%{x}<br>Weekly Savings ($)=%{y}<extra></extra>",
+    )
+).update_layout(
+    title="Weekly AI Assistant Savings Trend",
+    xaxis_title="Week",
+    yaxis_title="Weekly Savings ($)",
+    **plot_layout,
+)
+
+intervention_portfolio_fig = go.Figure(
+    go.Bar(
+        marker=dict(coloraxis="coloraxis"),
+        hovertemplate=(
+            "Intervention Type=%{x}<br>Total Savings ($)=%{y}"
+            "<br>confidence_score=%{marker.color}<extra></extra>"
+        ),
+    )
+).update_layout(
+    title="AI Intervention Portfolio Performance",
+    xaxis_title="Intervention Type",
+    yaxis_title="Total Savings ($)",
+    coloraxis=dict(colorscale="Viridis", colorbar_title_text="confidence_score"),
+    xaxis_tickangle=-45,
+    **plot_layout,
+)
+
+segment_adoption_fig = go.Figure(
+    go.Bar(
+        marker=dict(coloraxis="coloraxis"),
+        hovertemplate=(
+            "Customer Segment=%{x}<br>Adoption Rate=%{y}"
+            "<br>savings_amount=%{marker.color}<extra></extra>"
+        ),
+    )
+).update_layout(
+    title="AI Adoption Rate by Customer Segment",
+    xaxis_title="Customer Segment",
+    yaxis_title="Adoption Rate",
+    coloraxis=dict(colorscale="Blues", colorbar_title_text="savings_amount"),
+    yaxis_tickformat=".1%",
+    **plot_layout,
+)
+
+# One trace per intervention type is added at render time
+monthly_trends_fig = go.Figure().update_layout(
+    title="Monthly Savings Trends by Intervention Type",
+    xaxis_title="Month",
+    yaxis_title="Monthly Savings ($)",
+    legend_title_text="intervention_type",
+    **plot_layout,
+)
+
+cumulative_savings_fig = go.Figure(
+    go.Scattergl(
+        mode="lines",
+        line=dict(color=brand.color.tertiary, width=3),
+        hovertemplate="Date=%{x}<br>Cumulative Savings ($)=%{y}<extra></extra>",
+    )
+).update_layout(
+    title="Cumulative AI Assistant Savings",
+    xaxis_title="Date",
+    yaxis_title="Cumulative Savings ($)",
+    **plot_layout,
+)
+
+
 # Define UI
 app_ui = ui.page_sidebar(
     ui.sidebar(
@@ -117,14 +333,61 @@ app_ui = ui.page_sidebar(
         "This project contains synthetic data and analysis created for demonstration purposes only.",
         style="background-color: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; margin-bottom: 20px;",
     ),
-    # KPI Value Boxes
+    # KPI Value Boxes, filled in client-side from the kpi_data output
     ui.layout_columns(
-        ui.output_ui("total_savings_box"),
-        ui.output_ui("total_interventions_box"),
-        ui.output_ui("avg_confidence_box"),
-        ui.output_ui("unique_customers_box"),
+        ui.value_box(
+            title="Total Savings",
+            value=ui.span("–", id="kpi-total-savings"),
+            showcase=faicons.icon_svg("dollar-sign"),
+            theme="success",
+        ),
+        ui.value_box(
+            title="Total Interventions",
+            value=ui.span("–", id="kpi-total-interventions"),
+            showcase=faicons.icon_svg("bullseye"),
+            theme="primary",
+        ),
+        ui.value_box(
+            title="Avg Confidence",
+            value=ui.span("–", id="kpi-avg-confidence"),
+            showcase=faicons.icon_svg("chart-bar"),
+            theme="secondary",
+        ),
+        ui.value_box(
+            title="Unique Customers",
+            value=ui.span("–", id="kpi-unique-customers"),
+            showcase=faicons.icon_svg("users"),
+            theme="warning",
+        ),
         fill=False
     ),
+    ui.div(ui.output_text("kpi_data"), style="display: none;"),
+    ui.tags.script(
+        """
+        $(document).on("shiny:value", function (event) {
+          if (event.name !== "kpi_data") return;
+          const kpis = JSON.parse(event.value);
+          const number = new Intl.NumberFormat("en-US", {
+            maximumFractionDigits: 0,
+          });
+          const percent = new Intl.NumberFormat("en-US", {
+            style: "percent",
+            minimumFractionDigits: 1,
+            maximumFractionDigits: 1,
+          });
+          const set = (id, value) => {
+            document.getElementById(id).textContent = value;
+          };
+          set("kpi-total-savings", "$" + number.format(kpis.total_savings));
+          set("kpi-total-interventions", number.format(kpis.total_interventions));
+          set(
+            "kpi-avg-confidence",
+            kpis.avg_confidence === null ? "–" : percent.format(kpis.avg_confidence)
+          );
+          set("kpi-unique-customers", number.format(kpis.unique_customers));
+        });
+        """
+    ),
     ui.navset_tab(
         ui.nav_panel(
             "📊 Performance Overview",
@@ -151,7 +414,7 @@ app_ui = ui.page_sidebar(
     ),
     fillable=True,
     title="Pulse AI Performance Dashboard",
-    theme=ui.Theme.from_brand(__file__),
+    theme=ui.Theme.from_brand(brand),
 )
 
 
@@ -160,91 +423,55 @@ def server(input, output, session):
     @reactive.calc
     def filtered_data():
         """Filter data based on user inputs"""
-        # Filter AI interventions
-        filtered_ai = ai_interventions[
-            (
-                ai_interventions["intervention_date"]
-                >= pd.to_datetime(input.date_range()[0])
-            )
-            & (
-                ai_interventions["intervention_date"]
-                <= pd.to_datetime(input.date_range()[1])
-            )
-            & (ai_interventions["intervention_type"].isin(input.intervention_types()))
-        ]
-
-        # Join with customer data and filter by segments
-        merged_data = filtered_ai.merge(customers, on="customer_id", how="left")
-        merged_data = merged_data[
-            merged_data["customer_segment"].isin(input.customer_segments())
-        ]
-
-        return merged_data
-
-    @render.ui
-    def total_savings_box():
-        data = filtered_data()
-        total_savings = data["savings_amount"].sum()
-        return ui.value_box(
-            title="Total Savings",
-            value=f"${total_savings:,.0f}",
-            showcase=faicons.icon_svg("dollar-sign"),
-            theme="success",
+        start, end = input.date_range()
+        return filter_interventions(
+            np.datetime64(start, "D"),
+            np.datetime64(end, "D"),
+            tuple(sorted(input.intervention_types())),
+            tuple(sorted(input.customer_segments())),
         )
 
-    @render.ui
-    def total_interventions_box():
-        data = filtered_data()
-        total_interventions = len(data)
-        return ui.value_box(
-            title="Total Interventions",
-            value=f"{total_interventions:,}",
-            showcase=faicons.icon_svg("bullseye"),
-            theme="primary",
-        )
-
-    @render.ui
-    def avg_confidence_box():
+    @reactive.calc
+    def kpis():
+        """Compute all headline KPIs from the filtered data"""
         data = filtered_data()
-        avg_confidence = data["confidence_score"].mean()
-        return ui.value_box(
-            title="Avg Confidence",
-            value=f"{avg_confidence:.1%}",
-            showcase=faicons.icon_svg("chart-bar"),
-            theme="secondary",
-        )
+        n_rows = len(data.date)
+
+        # Customers are dense integer positions, so distinct customers are
+        # counted by marking them in a boolean array; the extra trailing slot
+        # takes unknown customers (-1) and is left out of the count
+        seen = np.zeros(len(customers) + 1, dtype=bool)
+        seen[data.cid] = True
+
+        return {
+            "total_savings": float(data.savings.sum()),
+            "total_interventions": n_rows,
+            # No rows means no average; sent as null rather than NaN
+            "avg_confidence": (
+                float(data.confidence.mean()) if n_rows else None
+            ),
+            "unique_customers": int(np.count_nonzero(seen[:-1])),
+        }
 
-    @render.ui
-    def unique_customers_box():
-        data = filtered_data()
-        unique_customers = data["customer_id"].nunique()
-        return ui.value_box(
-            title="Unique Customers",
-            value=f"{unique_customers:,}",
-            showcase=faicons.icon_svg("users"),
-            theme="warning",
-        )
+    # Hidden output, so it must keep updating while not visible
+    @output(suspend_when_hidden=False)
+    @render.text
+    def kpi_data():
+        return json.dumps(kpis())
 
     @render_widget
     def savings_trend_plot():
         """Plot savings trends over time"""
         data = filtered_data()
 
-        # Group by week for trend analysis
-        data["week"] = data["intervention_date"].dt.to_period("W")
-        weekly_savings = data.groupby("week")["savings_amount"].sum().reset_index()
-        weekly_savings["week"] = weekly_savings["week"].dt.start_time
-
-        fig = px.line(
-            weekly_savings,
-            x="week",
-            y="savings_amount",
-            title="Weekly AI Assistant Savings Trend",
-            labels={"savings_amount": "Weekly Savings ($)", "week": "Week"},
+        weeks, _, week_savings = bucket_sums(data.week, data.savings)
+        weekly_savings = pd.DataFrame(
+            {"week": weeks.astype("datetime64[D]"), "savings_amount": week_savings}
         )
 
-        fig.update_traces(line=dict(color="#8a2be2", width=3))
-        fig.update_layout(plot_bgcolor="white", height=400, title_font_size=16)
+        fig = go.Figure(savings_trend_fig)
+        fig.data[0].x = weekly_savings["week"]
+        fig.data[0].y = weekly_savings["savings_amount"]
 
         return fig
 
@@ -254,28 +481,21 @@ def server(input, output, session):
         """Plot intervention type performance"""
         data = filtered_data()
 
-        portfolio = (
-            data.groupby("intervention_type")
-            .agg({"savings_amount": "sum", "confidence_score": "mean"})
-            .reset_index()
+        types, counts, type_savings, type_confidence = bucket_sums(
+            data.type_code, data.savings, data.confidence
         )
-
-        fig = px.bar(
-            portfolio,
-            x="intervention_type",
-            y="savings_amount",
-            color="confidence_score",
-            title="AI Intervention Portfolio Performance",
-            labels={
-                "savings_amount": "Total Savings ($)",
-                "intervention_type": "Intervention Type",
-            },
-            color_continuous_scale="Viridis",
+        portfolio = pd.DataFrame(
+            {
+                "intervention_type": type_categories[types],
+                "savings_amount": type_savings,
+                "confidence_score": type_confidence / counts,
+            }
         )
 
-        fig.update_layout(
-            plot_bgcolor="white", height=400, title_font_size=16, xaxis_tickangle=-45
-        )
+        fig = go.Figure(intervention_portfolio_fig)
+        fig.data[0].x = portfolio["intervention_type"]
+        fig.data[0].y = portfolio["savings_amount"]
+        fig.data[0].marker.color = portfolio["confidence_score"]
 
         return fig
 
@@ -285,39 +505,26 @@ def server(input, output, session):
         """Customer segment adoption analysis"""
         data = filtered_data()
 
-        segment_stats = (
-            data.groupby("customer_segment")
-            .agg({"customer_id": "nunique", "savings_amount": "sum"})
-            .reset_index()
+        segments, _, segment_savings = bucket_sums(data.segment_code, data.savings)
+        # Distinct (segment, customer) pairs give the customers per segment
+        n_customers = len(customers)
+        pairs = np.unique(data.segment_code.astype(np.int64) * n_customers + data.cid)
+        _, segment_customers = bucket_sums(pairs // n_customers)
+        segment_stats = pd.DataFrame(
+            {
+                "customer_segment": segment_categories[segments],
+                "customers": segment_customers,
+                "total_customers": customers_per_segment[segments],
+                "savings_amount": segment_savings,
+            }
         )
 
-        # Get total customers per segment
-        total_customers = (
-            customers.groupby("customer_segment")
-            .size()
-            .reset_index(name="total_customers")
-        )
-        segment_stats = segment_stats.merge(total_customers, on="customer_segment")
-        segment_stats["adoption_rate"] = (
-            segment_stats["customer_id"] / segment_stats["total_customers"]
-        )
+        adoption_rate = segment_stats["customers"] / segment_stats["total_customers"]
 
-        fig = px.bar(
-            segment_stats,
-            x="customer_segment",
-            y="adoption_rate",
-            color="savings_amount",
-            title="AI Adoption Rate by Customer Segment",
-            labels={
-                "adoption_rate": "Adoption Rate",
-                "customer_segment": "Customer Segment",
-            },
-            color_continuous_scale="Blues",
-        )
-
-        fig.update_layout(
-            plot_bgcolor="white", height=400, title_font_size=16, yaxis_tickformat=".1%"
-        )
+        fig = go.Figure(segment_adoption_fig)
+        fig.data[0].x = segment_stats["customer_segment"]
+        fig.data[0].y = adoption_rate
+        fig.data[0].marker.color = segment_stats["savings_amount"]
 
         return fig
 
@@ -328,24 +535,33 @@ def server(input, output, session):
         """Monthly performance trends"""
         data = filtered_data()
 
-        data["month"] = data["intervention_date"].dt.to_period("M")
-        monthly_data = (
-            data.groupby(["month", "intervention_type"])
-            .agg({"savings_amount": "sum", "confidence_score": "mean"})
-            .reset_index()
+        # Bucket on (month, intervention type) pairs via a combined integer key
+        n_types = len(type_categories)
+        keys, _, month_savings = bucket_sums(
+            data.month * n_types + data.type_code, data.savings
         )
-        monthly_data["month"] = monthly_data["month"].dt.start_time
-
-        fig = px.line(
-            monthly_data,
-            x="month",
-            y="savings_amount",
-            color="intervention_type",
-            title="Monthly Savings Trends by Intervention Type",
-            labels={"savings_amount": "Monthly Savings ($)", "month": "Month"},
+        monthly_data = pd.DataFrame(
+            {
+                "month": (keys // n_types).astype("datetime64[M]"),
+                "intervention_type": type_categories[keys % n_types],
+                "savings_amount": month_savings,
+            }
         )
 
-        fig.update_layout(plot_bgcolor="white", height=400, title_font_size=16)
+        fig = go.Figure(monthly_trends_fig)
+        for intervention_type, trend in monthly_data.groupby(
+            "intervention_type", observed=True
+        ):
+            fig.add_scattergl(
+                x=trend["month"],
+                y=trend["savings_amount"],
+                mode="lines",
+                name=intervention_type,
+                hovertemplate=(
+                    f"intervention_type={intervention_type}"
+                    "<br>Month=%{x}<br>Monthly Savings ($)=%{y}<extra></extra>"
+                ),
+            )
 
         return fig
 
@@ -354,11 +570,11 @@ def server(input, output, session):
     @render.ui
     def financial_summary():
         """Financial impact summary"""
-        data = filtered_data()
-
-        total_savings = data["savings_amount"].sum()
-        total_interventions = len(data)
-        avg_savings_per_intervention = data["savings_amount"].mean()
+        total_savings = kpis()["total_savings"]
+        total_interventions = kpis()["total_interventions"]
+        avg_savings_per_intervention = (
+            total_savings / total_interventions if total_interventions else np.nan
+        )
 
         # Calculate projected annual savings
         days_in_period = (
@@ -397,22 +613,12 @@ def server(input, output, session):
     @render_widget
     def cumulative_savings():
         """Cumulative savings over time"""
-        data = filtered_data().sort_values("intervention_date")
-        data["cumulative_savings"] = data["savings_amount"].cumsum()
-
-        fig = px.line(
-            data,
-            x="intervention_date",
-            y="cumulative_savings",
-            title="Cumulative AI Assistant Savings",
-            labels={
-                "cumulative_savings": "Cumulative Savings ($)",
-                "intervention_date": "Date",
-            },
-        )
+        data = filtered_data()
 
-        fig.update_traces(line=dict(color="#4cd964", width=3))
-        fig.update_layout(plot_bgcolor="white", height=400, title_font_size=16)
+        fig = go.Figure(cumulative_savings_fig)
+        # Filtered rows keep the date order of ai_sorted, so no re-sort is needed
+        fig.data[0].x = data.date
+        fig.data[0].y = np.cumsum(data.savings)
 
         return fig
 